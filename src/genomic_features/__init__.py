@@ -1,7 +1,21 @@
+from importlib import import_module
 from importlib.metadata import version
 
-from . import ensembl, filters
-
 __all__ = ["ensembl"]
 
 __version__ = version("genomic-features")
+
+_SUBMODULES = {"ensembl", "filters"}
+
+
+def __getattr__(name):
+    # Import submodules on first access, so `import genomic_features` stays cheap
+    if name in _SUBMODULES:
+        module = import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted({*globals(), *_SUBMODULES})
@@ -1,3 +1,7 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
 import pooch
 
 PKG_CACHE_DIR = "genomic-features"
@@ -11,3 +15,12 @@ def retrieve_annotation(url):
         path=pooch.os_cache(PKG_CACHE_DIR),
         progressbar=True,
     )
+
+
+def retrieve_annotations(urls: list[str], max_workers: int = 4) -> list[str]:
+    """Download and cache several annotation files concurrently.
+
+    Returns the local paths in the same order as `urls`.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(retrieve_annotation, urls))
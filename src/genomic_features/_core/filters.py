@@ -2,33 +2,60 @@ from __future__ import annotations
 
 import re
 from abc import ABC, abstractmethod
+from functools import cache
+from typing import ClassVar
 
 import ibis
 
+# Genomic range in the format "{seq_name}:{start}-{end}"
+_RANGE_RE = re.compile(r"^(\w+):(\d+)-(\d+)$")
+
+
+@cache
+def _col(name: str) -> ibis.expr.deferred.Deferred:
+    """Deferred reference to a column, shared between filters."""
+    return ibis.deferred[name]
+
 
 # TODO: invert
 class AbstractFilterExpr(ABC):
     """Base class for all filter expressions. Defines logical operators and interface."""
 
+    _columns: frozenset[str] = frozenset()
+
     def __and__(self, other):
+        # EmptyFilter matches all rows, so it is the identity for &
+        if isinstance(other, EmptyFilter):
+            return self
+        if isinstance(self, EmptyFilter):
+            return other
         return AndFilterExpr(self, other)
 
     def __or__(self, other):
+        # ... and absorbing for |
+        if isinstance(self, EmptyFilter) or isinstance(other, EmptyFilter):
+            return EmptyFilter()
         return OrFilterExpr(self, other)
 
     def __invert__(self):
         return NotFilterExpr(self)
 
-    @abstractmethod
     def convert(self) -> ibis.expr.deferred.Deferred:
         """Convert genomic-features filter expression to ibis deferred expression."""
-        pass
+        # Filters are not modified after construction, so the result can be reused
+        if "_converted" not in self.__dict__:
+            self._converted = self._convert()
+        return self._converted
 
     @abstractmethod
-    def columns(self) -> set[str]:
-        """Columns required by this filter."""
+    def _convert(self) -> ibis.expr.deferred.Deferred:
+        """Build the ibis deferred expression for this filter."""
         pass
 
+    def columns(self) -> frozenset[str]:
+        """Columns required by this filter."""
+        return self._columns
+
 
 class EmptyFilter(AbstractFilterExpr):
     """An empty filter that returns all rows."""
@@ -36,20 +63,16 @@ class EmptyFilter(AbstractFilterExpr):
     def __repr__(self) -> str:
         return "EmptyFilter()"
 
-    def convert(self) -> None:
+    def _convert(self) -> None:
         return None
 
-    def columns(self) -> set[str]:
-        return set()
-
 
 class AbstractFilterOperatorExpr(AbstractFilterExpr):
     def __init__(self, left: AbstractFilterExpr, right: AbstractFilterExpr):
         self.left = left
         self.right = right
-
-    def columns(self) -> set[str]:
-        return self.left.columns() | self.right.columns()
+        # Operands are not modified after construction, so collect their columns once
+        self._columns = left.columns() | right.columns()
 
 
 class AndFilterExpr(AbstractFilterOperatorExpr):
@@ -58,8 +81,13 @@ class AndFilterExpr(AbstractFilterOperatorExpr):
     def __repr__(self) -> str:
         return f"({self.left} & {self.right})"
 
-    def convert(self) -> ibis.expr.deferred.Deferred:
-        return self.left.convert() & self.right.convert()
+    def _convert(self) -> ibis.expr.deferred.Deferred:
+        left, right = self.left.convert(), self.right.convert()
+        if left is None:
+            return right
+        if right is None:
+            return left
+        return left & right
 
 
 class NotFilterExpr(AbstractFilterExpr):
@@ -67,16 +95,14 @@ class NotFilterExpr(AbstractFilterExpr):
 
     def __init__(self, expr: AbstractFilterExpr):
         self.expr = expr
+        self._columns = expr.columns()
 
     def __repr__(self) -> str:
         return f"~{repr(self.expr)}"
 
-    def convert(self) -> ibis.expr.deferred.Deferred:
+    def _convert(self) -> ibis.expr.deferred.Deferred:
         return ~self.expr.convert()
 
-    def columns(self) -> set[str]:
-        return self.expr.columns()
-
 
 class OrFilterExpr(AbstractFilterOperatorExpr):
     """Logical or of two filters."""
@@ -84,22 +110,33 @@ class OrFilterExpr(AbstractFilterOperatorExpr):
     def __repr__(self) -> str:
         return f"({self.left} | {self.right})"
 
-    def convert(self) -> ibis.expr.deferred.Deferred:
-        return self.left.convert() | self.right.convert()
+    def _convert(self) -> ibis.expr.deferred.Deferred:
+        left, right = self.left.convert(), self.right.convert()
+        if left is None or right is None:
+            return None
+        return left | right
 
 
 class AbstractFilterEqualityExpr(AbstractFilterExpr):
+    _column: ClassVar[str]  # Column the filter is applied to
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if hasattr(cls, "_column"):
+            cls._columns = frozenset({cls._column})
+
     def __init__(self, value: str | list[str]):
-        self.value = value
+        # Store multiple values as an immutable tuple for the IN-list
+        self.value = value if isinstance(value, str) else tuple(value)
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.value})"
 
-    def convert(self) -> ibis.expr.deferred.Deferred:
+    def _convert(self) -> ibis.expr.deferred.Deferred:
         if isinstance(self.value, str):
-            return ibis.deferred[list(self.columns())[0]] == self.value
+            return _col(self._column) == self.value
         else:
-            return ibis.deferred[list(self.columns())[0]].isin(self.value)
+            return _col(self._column).isin(self.value)
 
 
 #  ------------------------ OVERLAP TYPE: any ------------------------ #
@@ -114,88 +151,108 @@ class AbstractFilterEqualityExpr(AbstractFilterExpr):
 
 
 class AbstractFilterRangeExpr(AbstractFilterExpr, ABC):
-    def __init__(self, value: str, type: str = "any"):
-        self.value = value
+    # (start, end, seq_name) columns the ranges are compared against
+    _range_columns: ClassVar[tuple[str, str, str]]
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if hasattr(cls, "_range_columns"):
+            cls._columns = frozenset(cls._range_columns)
+
+    def __init__(self, value: str | list[str], type: str = "any"):
+        # Store multiple ranges as an immutable tuple, as conversion is cached
+        self.value = value if isinstance(value, str) else tuple(value)
         self.type = type
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.value})"
 
-    @property
-    @abstractmethod
-    def _range_columns(self) -> list[str]:
-        pass
-
-    def convert(self) -> ibis.expr.deferred.Deferred:
-        match = re.match(r"^(\w+):(\d+)-(\d+)$", self.value)
-        if match is None:
-            raise ValueError(
-                "Invalid range format. Valid format is '{seq_name}:{start}-{end}'"
-            )
-        range_seq_name, range_start, range_end = match.groups()
-        start_column, end_column, seq_name_column = self._range_columns
+    def _overlap(self, range_start: int, range_end: int) -> ibis.expr.deferred.Deferred:
+        """Overlap of the feature with a single range on the same sequence."""
+        start_column, end_column, _ = self._range_columns
         if self.type == "any":
-            return (ibis.deferred[seq_name_column] == range_seq_name) & (
-                (
-                    (ibis.deferred[end_column] >= int(range_start))
-                    & (ibis.deferred[end_column] <= int(range_end))
-                )
-                | (
-                    (ibis.deferred[start_column] >= int(range_start))
-                    & (ibis.deferred[start_column] <= int(range_end))
-                )
-            )
+            return _col(end_column).between(range_start, range_end) | _col(
+                start_column
+            ).between(range_start, range_end)
         elif self.type == "within":
-            return (ibis.deferred[seq_name_column] == range_seq_name) & (
-                (ibis.deferred[end_column] <= int(range_end))
-                & (ibis.deferred[start_column] >= int(range_start))
-            )
+            return _col(start_column).between(range_start, range_end) & _col(
+                end_column
+            ).between(range_start, range_end)
         else:
             raise ValueError(
                 "Invalid overlap type. Valid options are 'any' and 'within'"
             )
 
+    def _convert(self) -> ibis.expr.deferred.Deferred:
+        ranges = (self.value,) if isinstance(self.value, str) else self.value
+        if not ranges:
+            raise ValueError(
+                "No ranges given. Valid format is '{seq_name}:{start}-{end}'"
+            )
+        # Group ranges by sequence, so each seq_name is only compared once
+        by_seq_name = {}
+        for value in ranges:
+            match = _RANGE_RE.match(value)
+            if match is None:
+                raise ValueError(
+                    "Invalid range format. Valid format is '{seq_name}:{start}-{end}'"
+                )
+            range_seq_name, range_start, range_end = match.groups()
+            by_seq_name.setdefault(range_seq_name, []).append(
+                self._overlap(int(range_start), int(range_end))
+            )
+        seq_name_column = self._range_columns[2]
+        return _any_of(
+            [
+                (_col(seq_name_column) == seq_name) & _any_of(overlaps)
+                for seq_name, overlaps in by_seq_name.items()
+            ]
+        )
+
+
+def _any_of(exprs: list[ibis.expr.deferred.Deferred]) -> ibis.expr.deferred.Deferred:
+    """Combine expressions with `|` as a balanced tree, keeping nesting shallow."""
+    while len(exprs) > 1:
+        exprs = [exprs[i] | exprs[i + 1] for i in range(0, len(exprs) - 1, 2)] + (
+            [exprs[-1]] if len(exprs) % 2 else []
+        )
+    return exprs[0]
+
 
 class GeneIDFilter(AbstractFilterEqualityExpr):
     """Filter by gene_id."""
 
-    def columns(self) -> set[str]:
-        return {"gene_id"}
+    _column = "gene_id"
 
 
 class GeneBioTypeFilter(AbstractFilterEqualityExpr):
     """Filter by gene_biotype."""
 
-    def columns(self) -> set[str]:
-        return {"gene_biotype"}
+    _column = "gene_biotype"
 
 
 class TxIDFilter(AbstractFilterEqualityExpr):
     """Filter by tx_id column."""
 
-    def columns(self) -> set[str]:
-        return {"tx_id"}
+    _column = "tx_id"
 
 
 class TxBioTypeFilter(AbstractFilterEqualityExpr):
     """Filter by tx_biotype column."""
 
-    def columns(self) -> set[str]:
-        return {"tx_biotype"}
+    _column = "tx_biotype"
 
 
 class ExonIDFilter(AbstractFilterEqualityExpr):
     """Filter by exon_id column."""
 
-    def columns(self) -> set[str]:
-        return {"exon_id"}
+    _column = "exon_id"
 
 
 class GeneNameFilter(AbstractFilterEqualityExpr):
     """Filter by gene_name."""
 
-    def columns(self) -> set[str]:
-        return {"gene_name"}
+    _column = "gene_name"
 
 
 class GeneRangesFilter(AbstractFilterRangeExpr):
@@ -204,19 +261,15 @@ class GeneRangesFilter(AbstractFilterRangeExpr):
 
     Parameters
     ----------
-    value : str
-        Genomic range in the format "seq_name:start-end"
+    value : str | list[str]
+        Genomic range in the format "seq_name:start-end", or a list of ranges.
+        Features overlapping any of the ranges are kept.
     type : str
         String indicating how overlaps are to be filters.
         Options are 'any' and 'within'. Default is 'any'
     """
 
-    @property
-    def _range_columns(self) -> list[str]:
-        return ["gene_seq_start", "gene_seq_end", "seq_name"]
-
-    def columns(self) -> set[str]:
-        return set(self._range_columns)
+    _range_columns = ("gene_seq_start", "gene_seq_end", "seq_name")
 
 
 class SeqNameFilter(AbstractFilterEqualityExpr):
@@ -228,19 +281,15 @@ class SeqNameFilter(AbstractFilterEqualityExpr):
     >>> ensdb.genes(filter=gf.filters.SeqNameFilter("MT"))
     """
 
+    _column = "seq_name"
+
     def __init__(self, value: str | int | list):
-        if isinstance(value, int):
-            value = str(value)
-        elif isinstance(value, str):
-            pass
+        if isinstance(value, str):
+            self.value = value
+        elif isinstance(value, int):
+            self.value = str(value)
         else:
-            orig_value = value
-            value = [str(v) for v in orig_value]
-
-        self.value = value
-
-    def columns(self) -> set[str]:
-        return {"seq_name"}
+            self.value = tuple(map(str, value))
 
 
 class CanonicalTxFilter(AbstractFilterExpr):
@@ -256,17 +305,16 @@ class CanonicalTxFilter(AbstractFilterExpr):
     ... )
     """
 
+    _columns = frozenset({"tx_is_canonical"})
+
     def __init__(self):
         pass
 
     def __repr__(self) -> str:
         return "CanonicalTxFilter()"
 
-    def columns(self) -> set[str]:
-        return {"tx_is_canonical"}
-
-    def convert(self) -> ibis.expr.deferred.Deferred:
-        return ibis.deferred["tx_is_canonical"] == 1
+    def _convert(self) -> ibis.expr.deferred.Deferred:
+        return _col("tx_is_canonical") == 1
 
 
 class UniProtIDFilter(AbstractFilterEqualityExpr):
@@ -278,8 +326,7 @@ class UniProtIDFilter(AbstractFilterEqualityExpr):
     >>> ensdb.genes(filter=gf.filters.UniProtIDFilter("P12345"))
     """
 
-    def columns(self) -> set[str]:
-        return {"uniprot_id"}
+    _column = "uniprot_id"
 
 
 class UniProtDBFilter(AbstractFilterEqualityExpr):
@@ -291,8 +338,7 @@ class UniProtDBFilter(AbstractFilterEqualityExpr):
     >>> ensdb.genes(filter=gf.filters.UniProtDBFilter("SWISSPROT"))
     """
 
-    def columns(self) -> set[str]:
-        return {"uniprot_db"}
+    _column = "uniprot_db"
 
 
 class UniProtMappingTypeFilter(AbstractFilterEqualityExpr):
@@ -304,5 +350,4 @@ class UniProtMappingTypeFilter(AbstractFilterEqualityExpr):
     >>> ensdb.genes(filter=gf.filters.UniProtMappingTypeFilter("DIRECT"))
     """
 
-    def columns(self) -> set[str]:
-        return {"uniprot_mapping_type"}
+    _column = "uniprot_mapping_type"
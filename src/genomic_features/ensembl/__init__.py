@@ -1 +1 @@
-from .ensembldb import EnsemblDB, annotation, list_ensdb_annotations
+from .ensembldb import EnsemblDB, annotation, annotations, list_ensdb_annotations
@@ -1,20 +1,20 @@
 from __future__ import annotations
 
+import re
+import time
 import warnings
-from functools import cached_property
+from functools import cache, cached_property, lru_cache
 from itertools import product
 from pathlib import Path
 from typing import Final, Literal
 
 import ibis
-import requests
 from ibis import deferred
 from ibis.expr.types import Table as IbisTable
 from pandas import DataFrame, Timestamp
-from requests.exceptions import HTTPError
 
 from genomic_features import filters
-from genomic_features._core.cache import retrieve_annotation
+from genomic_features._core.cache import retrieve_annotation, retrieve_annotations
 from genomic_features._core.filters import AbstractFilterExpr
 
 PKG_CACHE_DIR = "genomic-features"
@@ -25,6 +25,94 @@ ANNOTATION_HUB_URL = (
 )
 TIMESTAMP_URL = "https://annotationhub.bioconductor.org/metadata/database_timestamp"
 
+_RDATAPATH_RE = re.compile(r"/v(?P<Ensembl_version>\d+)/EnsDb\.(?P<Species>[^.]+)\.")
+
+# How long (in seconds) to trust the cached AnnotationHub database before
+# checking its timestamp again
+_ANNOTATION_HUB_CHECK_INTERVAL = 600
+_annotation_hub_cache = {}
+
+
+# The annotation databases are only read: let SQLite map them into memory and keep
+# temporary sort/distinct structures off disk
+_SQLITE_PRAGMAS = (
+    "mmap_size = 268435456",
+    "temp_store = MEMORY",
+)
+
+# Catalog queries listing the columns of every table, with their position
+_SCHEMA_QUERIES = {
+    "sqlite": (
+        "SELECT m.name AS table_name, p.name AS column_name, p.cid AS position "
+        "FROM sqlite_master AS m JOIN pragma_table_info(m.name) AS p "
+        "WHERE m.type IN ('table', 'view') AND m.name NOT LIKE 'sqlite_%'"
+    ),
+    "duckdb": (
+        "SELECT table_name, column_name, ordinal_position AS position "
+        "FROM information_schema.columns "
+        "WHERE table_catalog = current_database() "
+        "AND table_schema = current_schema()"
+    ),
+}
+
+# Primary key of the tables queried by the EnsemblDB accessors
+_PRIMARY_KEYS = {
+    "gene": "gene_id",
+    "tx": "tx_id",
+    "exon": "exon_id",
+    "chromosome": "seq_name",
+}
+
+# Order in which tables are considered when resolving columns and joins
+_TABLE_DEGREE = {
+    "gene": 1,
+    "tx": 2,
+    "tx2exon": 3,
+    "exon": 4,
+    "chromosome": 5,
+    "protein": 6,
+    "uniprot": 7,
+    "protein_domain": 8,
+    "entrezgene": 9,
+    "metadata": 99,
+}
+
+# Tables describing the proteome, and the genome tables they are linked to via tx
+_PROTEIN_TABLES = frozenset({"protein", "uniprot", "protein_domain"})
+_GENOME_TABLES = frozenset({"gene", "tx2exon", "exon", "chromosome", "entrezgene"})
+
+# Pairs of directly joinable tables and the key they are joined on
+_JOIN_KEYS = {
+    frozenset(pair): key
+    for pair, key in [
+        (("gene", "tx"), "gene_id"),
+        (("gene", "chromosome"), "seq_name"),
+        (("tx", "tx2exon"), "tx_id"),
+        (("tx2exon", "exon"), "exon_id"),
+        (("tx", "protein"), "tx_id"),
+        (("gene", "entrezgene"), "gene_id"),
+        (("protein", "protein_domain"), "protein_id"),
+        (("protein", "uniprot"), "protein_id"),
+        (("uniprot", "protein_domain"), "protein_id"),
+    ]
+}
+
+
+def _connect_sqlite(path: str | Path) -> ibis.BaseBackend:
+    """Connect to a SQLite database file that will only be read."""
+    conn = ibis.sqlite.connect(path)
+    for pragma in _SQLITE_PRAGMAS:
+        conn.raw_sql(f"PRAGMA {pragma}")
+    return conn
+
+
+def _disconnect(conn: ibis.BaseBackend) -> None:
+    """Close a backend connection."""
+    if hasattr(conn, "disconnect"):
+        conn.disconnect()
+    else:  # SQLite backends before ibis 9 wrap a SQLAlchemy engine
+        conn.con.dispose()
+
 
 def annotation(
     species: str, version: str | int, backend: Literal["duckdb", "sqlite"] = "sqlite"
@@ -49,14 +137,21 @@ def annotation(
     -----
     >>> gf.ensembl.annotation("Hsapiens", "108")
     """
+    # Normalize version, so 108 and "108" share a cache entry
+    return _annotation(species, str(version), backend)
+
+
+@lru_cache(maxsize=32)
+def _annotation(species: str, version: str, backend: str) -> EnsemblDB:
+    """Open (and cache) the annotation database, see `annotation`."""
+    from requests.exceptions import HTTPError
+
     try:
-        sqlite_file_path = retrieve_annotation(
-            f"{BIOC_ANNOTATION_HUB_URL}/AHEnsDbs/v{version}/EnsDb.{species}.v{version}.sqlite"
-        )
+        sqlite_file_path = retrieve_annotation(_ensdb_url(species, version))
 
         if backend == "sqlite":
             # Connect to SQLite database
-            conn = ibis.sqlite.connect(sqlite_file_path)
+            conn = _connect_sqlite(sqlite_file_path)
             ensdb = EnsemblDB(conn)
         elif backend == "duckdb":
             # Connect to DuckDB through Ibis
@@ -77,6 +172,85 @@ def annotation(
     return ensdb
 
 
+def annotations(
+    species_versions: list[tuple[str, str | int]],
+    backend: Literal["duckdb", "sqlite"] = "sqlite",
+) -> list[EnsemblDB]:
+    """Get several annotation databases, downloading them concurrently.
+
+    Parameters
+    ----------
+    species_versions
+        Pairs of species name and ensembl release number, see `annotation`.
+    backend
+        The backend to use for the databases. Either "sqlite" or "duckdb".
+
+    Returns
+    -------
+    The annotation databases, in the order they were requested.
+
+
+    Usage
+    -----
+    >>> human, mouse = gf.ensembl.annotations([("Hsapiens", 108), ("Mmusculus", 108)])
+    """
+    from requests.exceptions import HTTPError
+
+    try:
+        retrieve_annotations([_ensdb_url(s, v) for s, v in species_versions])
+    except HTTPError:
+        pass  # raised again, with a clearer message, by annotation() below
+    return [annotation(s, v, backend) for s, v in species_versions]
+
+
+def _ensdb_url(species: str, version: str | int) -> str:
+    return f"{BIOC_ANNOTATION_HUB_URL}/AHEnsDbs/v{version}/EnsDb.{species}.v{version}.sqlite"
+
+
+@cache
+def _http_session():
+    """Shared session, so repeated timestamp checks reuse the connection."""
+    # requests is only imported once something is fetched, it is slow to import
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util import Retry
+
+    session = requests.Session()
+    session.mount(
+        "https://", HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.2))
+    )
+    return session
+
+
+def _annotationhub_db() -> ibis.BaseBackend:
+    """Connect to the cached AnnotationHub database, refreshing it if outdated.
+
+    The remote timestamp is checked at most every `_ANNOTATION_HUB_CHECK_INTERVAL`
+    seconds. The open connection is reused until the remote timestamp changes.
+    """
+    now = time.monotonic()
+    if (
+        _annotation_hub_cache
+        and now - _annotation_hub_cache["checked"] < _ANNOTATION_HUB_CHECK_INTERVAL
+    ):
+        return _annotation_hub_cache["db"]
+
+    # Get latest AnnotationHub timestamp, then check it against the cached copy
+    timestamp = _http_session().get(TIMESTAMP_URL, timeout=10).text
+    latest_ts = Timestamp(timestamp).replace(tzinfo=None)
+    ahdb = _annotation_hub_cache.get("db")
+    if ahdb is None:
+        ahdb = _connect_sqlite(retrieve_annotation(ANNOTATION_HUB_URL))
+    cached_ts = ahdb.table("timestamp")["timestamp"].execute().iat[0]
+    if latest_ts != cached_ts:
+        _disconnect(ahdb)  # release the file before replacing it
+        Path(retrieve_annotation(ANNOTATION_HUB_URL)).unlink()
+        ahdb = _connect_sqlite(retrieve_annotation(ANNOTATION_HUB_URL))
+
+    _annotation_hub_cache.update(db=ahdb, checked=now)
+    return ahdb
+
+
 def list_ensdb_annotations(species: None | str | list[str] = None) -> DataFrame:
     """List available Ensembl gene annotations.
 
@@ -88,49 +262,37 @@ def list_ensdb_annotations(species: None | str | list[str] = None) -> DataFrame:
 
     Returns
     -------
-    A table of available species and annotation versions in EnsDb.
+    A table of available species (as a categorical column) and annotation versions in
+    EnsDb.
 
 
     Usage
     -----
     >>> gf.ensembl.list_ensdb_annotations("Mmusculus")
     """
-    # Get latest AnnotationHub timestamp
-    db_path = Path(retrieve_annotation(ANNOTATION_HUB_URL))
-    timestamp = requests.get(TIMESTAMP_URL).text
-    ahdb = ibis.sqlite.connect(db_path)
-    latest_ts = Timestamp(timestamp).replace(tzinfo=None)
-    cached_ts = ahdb.table("timestamp").execute()["timestamp"][0]
-    if latest_ts != cached_ts:
-        db_path.unlink()
-        ahdb = ibis.sqlite.connect(retrieve_annotation(ANNOTATION_HUB_URL))
+    ahdb = _annotationhub_db()
 
+    # Filter on the backend, so only the matching paths are read into pandas
+    predicate = deferred.rdataclass == "EnsDb"
+    if species is not None:
+        species_list = [species] if isinstance(species, str) else species
+        predicate &= ibis.or_(
+            *(deferred.rdatapath.contains(f"/EnsDb.{s}.v") for s in species_list)
+        )
     version_table = (
-        ahdb.table("rdatapaths").filter(deferred.rdataclass == "EnsDb").execute()
-    )
-    version_table["Species"] = (
-        version_table["rdatapath"]
-        .str.split("/", expand=True)[2]
-        .str.split(".", expand=True)[1]
+        ahdb.table("rdatapaths").filter(predicate).select("rdatapath").execute()
     )
-    if species is not None:
-        if isinstance(species, str):
-            version_table = version_table[version_table["Species"] == species]
-        else:
-            version_table = version_table[version_table["Species"].isin(species)]
-        # check that species exist
-        if version_table.shape[0] == 0:
-            raise ValueError(
-                f"No Ensembl database found for {species}. Available species can "
-                f"be found via: `list_ensdb_annotations()['Species'].unique()`."
-            )
+    # check that species exist
+    if species is not None and version_table.shape[0] == 0:
+        raise ValueError(
+            f"No Ensembl database found for {species}. Available species can "
+            f"be found via: `list_ensdb_annotations()['Species'].unique()`."
+        )
 
-    version_table["Ensembl_version"] = version_table["rdatapath"].str.split(
-        "/", expand=True
-    )[1]
-    version_table["Ensembl_version"] = (
-        version_table["Ensembl_version"].str.replace("v", "").astype(int)
-    )
+    # rdatapath looks like "AHEnsDbs/v108/EnsDb.Hsapiens.v108.sqlite"
+    version_table = version_table["rdatapath"].str.extract(_RDATAPATH_RE)
+    version_table["Species"] = version_table["Species"].astype("category")
+    version_table["Ensembl_version"] = version_table["Ensembl_version"].astype(int)
     return version_table[["Species", "Ensembl_version"]].sort_values(
         ["Species", "Ensembl_version"]
     )
@@ -141,6 +303,8 @@ class EnsemblDB:
 
     def __init__(self, connection: ibis.BaseBackend):
         self.db = connection
+        self._table_exprs: dict[str, IbisTable] = {}
+        self._join_exprs: dict[tuple, IbisTable] = {}
 
     @cached_property
     def metadata(self) -> dict:
@@ -148,6 +312,39 @@ class EnsemblDB:
         metadata_tbl = self.db.table("metadata").execute()
         return dict(zip(metadata_tbl["name"], metadata_tbl["value"]))
 
+    def _table(self, name: str) -> IbisTable:
+        """Ibis table expression for `name`, reflected from the database only once."""
+        if name not in self._table_exprs:
+            self._table_exprs[name] = self.db.table(name)
+        return self._table_exprs[name]
+
+    @cached_property
+    def _schema(self) -> dict[str, tuple[str, ...]]:
+        """Column names for every table in the database, keyed by table name."""
+        query = _SCHEMA_QUERIES.get(self.db.name)
+        if query is None:
+            return {t: tuple(self.db.table(t).columns) for t in self.db.list_tables()}
+        # Read all table schemas in a single round trip
+        catalog = self.db.sql(query).order_by(["table_name", "position"]).execute()
+        schema = {}
+        for table, column in zip(catalog["table_name"], catalog["column_name"]):
+            schema.setdefault(table, []).append(column)
+        return {t: tuple(cols) for t, cols in schema.items()}
+
+    @cached_property
+    def _column_to_tables(self) -> dict[str, list[str]]:
+        """Tables containing each column, ordered by degree."""
+        index = {}
+        for t in self._tables_by_degree():
+            for c in self._schema[t]:
+                index.setdefault(c, []).append(t)
+        return index
+
+    @cached_property
+    def _queryable_columns(self) -> frozenset[str]:
+        """Columns that can be requested from any (non-metadata) table."""
+        return frozenset(self.list_columns())
+
     def __repr__(self) -> str:
         d = self.metadata
         return (
@@ -161,7 +358,8 @@ class EnsemblDB:
         cols: list[str] | None = None,
         filter: AbstractFilterExpr = filters.EmptyFilter(),
         join_type: Literal["inner", "left"] = "inner",
-    ) -> DataFrame:
+        execute: bool = True,
+    ) -> DataFrame | IbisTable:
         """Get gene annotations.
 
         Parameters
@@ -173,11 +371,16 @@ class EnsemblDB:
             Filters to apply to the query.
         join_type
             How to perform joins during the query (if cols or filters requires them).
+        execute
+            Whether to run the query. If False, the Ibis expression is returned
+            instead, which can be refined further (e.g. with `.limit()`) and runs
+            in the database once executed.
 
 
         Usage
         -----
         >>> ensdb.genes(cols=["gene_id", "gene_name", "tx_id"])
+        >>> ensdb.genes(execute=False).limit(10).execute()
         """
         table: Final = "gene"
         if cols is None:
@@ -189,14 +392,15 @@ class EnsemblDB:
             cols.append("gene_id")
 
         query = self._build_query(table, cols, filter, join_type)
-        return self._execute_query(query)
+        return self._execute_query(query, execute)
 
     def transcripts(
         self,
         cols: list[str] | None = None,
         filter: AbstractFilterExpr = filters.EmptyFilter(),
         join_type: Literal["inner", "left"] = "inner",
-    ) -> DataFrame:
+        execute: bool = True,
+    ) -> DataFrame | IbisTable:
         """Get transcript annotations.
 
         Parameters
@@ -208,6 +412,10 @@ class EnsemblDB:
             Filters to apply to the query.
         join_type
             How to perform joins during the query (if cols or filters requires them).
+        execute
+            Whether to run the query. If False, the Ibis expression is returned
+            instead, which can be refined further (e.g. with `.limit()`) and runs
+            in the database once executed.
 
 
         Usage
@@ -227,14 +435,15 @@ class EnsemblDB:
             cols.append("seq_name")
 
         query = self._build_query(table, cols, filter, join_type)
-        return self._execute_query(query)
+        return self._execute_query(query, execute)
 
     def exons(
         self,
         cols: list[str] | None = None,
         filter: AbstractFilterExpr = filters.EmptyFilter(),
         join_type: Literal["inner", "left"] = "inner",
-    ) -> DataFrame:
+        execute: bool = True,
+    ) -> DataFrame | IbisTable:
         """Get exons table.
 
         Parameters
@@ -246,6 +455,10 @@ class EnsemblDB:
             Filter to apply to the query.
         join_type
             Type of join to use for the query.
+        execute
+            Whether to run the query. If False, the Ibis expression is returned
+            instead, which can be refined further (e.g. with `.limit()`) and runs
+            in the database once executed.
 
 
         Usage
@@ -267,38 +480,79 @@ class EnsemblDB:
             cols.append("seq_name")
 
         query = self._build_query(table, cols, filter, join_type)
-        return self._execute_query(query)
+        return self._execute_query(query, execute)
 
-    def _execute_query(self, query: IbisTable) -> DataFrame:
-        """Run a query and return the results."""
+    def _execute_query(
+        self, query: IbisTable, execute: bool = True
+    ) -> DataFrame | IbisTable:
+        """Run a query and return the results, or the unevaluated query."""
         # TODO: Allow more options for returning results
-        return query.distinct().execute()
+        return query.execute() if execute else query
 
-    def chromosomes(self) -> DataFrame:
+    def chromosomes(
+        self,
+        cols: list[str] | None = None,
+        filter: AbstractFilterExpr = filters.EmptyFilter(),
+        execute: bool = True,
+    ) -> DataFrame | IbisTable:
         """Get chromosome information (seq_name, length, etc.).
 
+        Rows are returned in the order of the chromosome table. If columns or filters
+        from other tables require a join, the row order is unspecified.
+
+        Parameters
+        ----------
+        cols
+            Which columns to retrieve from the database. Can be from other tables.
+            Returns all chromosome columns if None.
+        filter
+            Filter to apply to the query.
+        execute
+            Whether to run the query. If False, the Ibis expression is returned
+            instead, which can be refined further (e.g. with `.limit()`) and runs
+            in the database once executed.
+
+
         Usage
         -----
         >>> ensdb.chromosomes()
+        >>> ensdb.chromosomes(filter=gf.filters.SeqNameFilter(["X", "Y"]))
         """
-        return self.db.table("chromosome").execute()
+        table: Final = "chromosome"
+        if cols is None:
+            cols = self.list_columns(table)  # get all columns
+
+        cols = cols.copy()
+        # Require primary key in output
+        if "seq_name" not in cols:
+            cols.append("seq_name")
+
+        # Keep the table's own order, sorting seq_name as text would put "10" before "2"
+        query = self._build_query(table, cols, filter, order=False)
+        return self._execute_query(query, execute)
 
     def _build_query(
         self,
-        table: Literal["gene", "tx", "exon"],
+        table: Literal["gene", "tx", "exon", "chromosome"],
         cols: list[str],
         filter: AbstractFilterExpr,
         join_type: Literal["inner", "left"] = "inner",
+        order: bool = True,
     ) -> IbisTable:
-        """Build a query for the genomic features table."""
+        """Build a query for the genomic features table.
+
+        If `order` is False, rows are returned in the order the backend reads them.
+        """
         # Finalize cols
-        self._clean_columns(cols)
+        cols = self._clean_columns(cols)
         for col in filter.columns():
             if col not in cols:
                 cols.append(col)
 
-        # check if join is required
-        tables = self._get_required_tables(self._tables_for_columns(cols))
+        # check if join is required, preferring columns of the queried table
+        tables = self._get_required_tables(
+            self._tables_for_columns(cols, start_with=table)
+        )
 
         # Basically just to make sure exons stay in the query
         if table not in tables:
@@ -307,9 +561,17 @@ class EnsemblDB:
         if len(tables) > 1:
             query = self._join_query(tables, start_with=table, join_type=join_type)
         else:
-            query = self.db.table(table)
-        # add filter
-        query = query.filter(filter.convert()).select(cols).order_by(cols)
+            query = self._table(table)
+        # add filter, so it is applied by the backend before the projection
+        predicate = filter.convert()
+        if predicate is not None:
+            query = query.filter(predicate)
+        query = query.select(cols)
+        # rows of a single table are already unique if its primary key is selected
+        if len(tables) > 1 or _PRIMARY_KEYS.get(table) not in cols:
+            query = query.distinct()
+        if order:
+            query = query.order_by(cols)
         return query
 
     def _join_query(
@@ -319,29 +581,28 @@ class EnsemblDB:
         join_type: Literal["inner", "left"] = "inner",
     ) -> IbisTable:
         """Join tables and return a query."""
-        # check for intermediate tables
-        JOIN_TABLE = [
-            (("gene", "tx"), "gene_id"),
-            (("gene", "chromosome"), "seq_name"),
-            (("tx", "tx2exon"), "tx_id"),
-            (("tx2exon", "exon"), "exon_id"),
-            (("tx", "protein"), "tx_id"),
-            (("gene", "entrezgene"), "gene_id"),
-            (("protein", "protein_domain"), "protein_id"),
-            (("protein", "uniprot"), "protein_id"),
-            (("uniprot", "protein_domain"), "protein_id"),
-        ]
+        # Joined expressions are immutable, so they are built once per join shape
+        shape = (tuple(tables), start_with, join_type)
+        if shape not in self._join_exprs:
+            self._join_exprs[shape] = self._build_join(tables, start_with, join_type)
+        return self._join_exprs[shape]
+
+    def _build_join(
+        self,
+        tables: list[str],
+        start_with: str,
+        join_type: Literal["inner", "left"],
+    ) -> IbisTable:
+        """Build the join of `tables`, see `_join_query`."""
         tables = tables.copy()
         tables.remove(start_with)
-        db = self.db
         current_tables = [start_with]
-        query = db.table(start_with)
+        query = self._table(start_with)
 
         while len(tables) > 0:
-            for (table_names, key), t1_name, t2_name in product(  # noqa: B007
-                JOIN_TABLE, current_tables, tables
-            ):
-                if t1_name in table_names and t2_name in table_names:
+            for t1_name, t2_name in product(current_tables, tables):
+                key = _JOIN_KEYS.get(frozenset((t1_name, t2_name)))
+                if key is not None:
                     break
             else:
                 raise ValueError(
@@ -351,7 +612,7 @@ class EnsemblDB:
             current_tables.append(t2_name)
             tables.remove(t2_name)
 
-            t2 = db.table(t2_name)
+            t2 = self._table(t2_name)
             if join_type == "inner":
                 query = query.join(t2, predicates=[key], how="inner")
             elif join_type == "left":
@@ -370,70 +631,56 @@ class EnsemblDB:
 
     def list_tables(self) -> list:
         """List all tables available in the genomic features database."""
-        return self.db.list_tables()
+        return list(self._schema)
+
+    @cached_property
+    def _ordered_tables(self) -> tuple[str, ...]:
+        """All tables in the database, ordered by degree."""
+        return tuple(sorted(self.list_tables(), key=_TABLE_DEGREE.__getitem__))
 
     def _tables_by_degree(self, tab: list[str] = None) -> list:
         """Order tables available in the genomic features database."""
         if tab is None:
-            tab = self.list_tables()  # list of table names
+            return list(self._ordered_tables)
         # check that all tables are in the database and print warning
-        if not set(tab).issubset(set(self.list_tables())):
-            missing_tables = ", ".join(set(tab) - set(self.list_tables()))
+        missing_tables = set(tab).difference(self._ordered_tables)
+        if missing_tables:
             warnings.warn(
-                f"The following tables are not in the database: {missing_tables}.",
+                f"The following tables are not in the database: "
+                f"{', '.join(missing_tables)}.",
                 UserWarning,
                 stacklevel=2,
             )
 
-            tab = list(set(tab) & set(self.list_tables()))  # remove tables not in db
-
-        # order tables
-
-        table_order = {
-            "gene": 1,
-            "tx": 2,
-            "tx2exon": 3,
-            "exon": 4,
-            "chromosome": 5,
-            "protein": 6,
-            "uniprot": 7,
-            "protein_domain": 8,
-            "entrezgene": 9,
-            "metadata": 99,
-        }
-
-        return sorted(tab, key=lambda x: table_order[x])
+        # order tables, dropping those not in the db
+        return [t for t in self._ordered_tables if t in tab]
 
     def _get_required_tables(self, tab) -> list:
         """Given tables, get all intermediate tables required to execute the query."""
+        tab = set(tab)
         # If we have exon and any other table, we need definitely tx2exon
         if "exon" in tab and len(tab) > 1:
-            tab = list(set(tab + ["tx2exon"]))
+            tab.add("tx2exon")
 
         # If we have chromosome and any other table, we'll need gene
-        if "seq_name" in tab and len(tab) > 1:
-            tab = list(set(tab + ["gene"]))
+        if "chromosome" in tab and len(tab) > 1:
+            tab.add("gene")
 
         # If we have exon and we have gene, we'll need also tx
         if ("exon" in tab or "tx2exon" in tab) and "gene" in tab:
-            tab = list(set(tab + ["tx"]))
+            tab.add("tx")
 
         # Resolve the proteins: need tx to map between proteome and genome
-        if any(t in ["uniprot", "protein_domain", "protein"] for t in tab) and any(
-            t in ["exon", "tx2exon", "gene", "chromosome", "entrezgene"] for t in tab
-        ):
-            tab = list(set(tab + ["tx"]))
+        if tab & _PROTEIN_TABLES and tab & _GENOME_TABLES:
+            tab.add("tx")
 
         # Need protein.
-        if any(t in ["uniprot", "protein_domain"] for t in tab) and any(
-            t in ["exon", "tx2exon", "tx", "gene", "chromosome", "entrezgene"]
-            for t in tab
-        ):
-            tab = list(set(tab + ["protein"]))
+        if tab & {"uniprot", "protein_domain"} and tab & (_GENOME_TABLES | {"tx"}):
+            tab.add("protein")
 
         # entrezgene is only linked via gene
         if "entrezgene" in tab and len(tab) > 1:
-            tab = list(set(tab + ["gene"]))
+            tab.add("gene")
 
         return self._tables_by_degree(tab)
 
@@ -448,7 +695,7 @@ class EnsemblDB:
 
         columns = []
         for t in tables:
-            for c in self.db.table(t).columns:
+            for c in self._schema[t]:
                 if c not in columns:
                     columns.append(c)
         return columns
@@ -458,9 +705,10 @@ class EnsemblDB:
         if isinstance(columns, str):
             columns = [columns]
 
-        valid_columns = set(self.list_columns())
-        cols = list(filter(lambda c: c in valid_columns, columns))
-        invalid_columns = set(columns) - valid_columns
+        valid_columns = self._queryable_columns
+        cols, invalid_columns = [], []
+        for c in dict.fromkeys(columns):  # drop duplicates, keep order
+            (cols if c in valid_columns else invalid_columns).append(c)
         if invalid_columns:
             raise ValueError(
                 f"The following columns are not found in any database: {invalid_columns}"
@@ -487,20 +735,15 @@ class EnsemblDB:
             if start_with not in table_list:
                 raise ValueError(f"Invalid table: {start_with}")
             # remove start_with from table_list and add it to the beginning of the list
+            # no other table is needed if start_with has all columns
+            if set(cols).issubset(self._schema[start_with]):
+                return [start_with]
             table_list.remove(start_with)
             table_list = [start_with] + table_list
 
-        tables = []
-        for t in table_list:
-            # check if all columns are in one table
-            if set(cols).issubset(self.db.table(t).columns):
-                tables.append(t)
-                return tables
-            else:
-                # check if a single column is in the table
-                for c in cols.copy():
-                    if c in self.db.table(t).columns:
-                        if t not in tables:
-                            tables.append(t)
-                        cols.remove(c)  # remove column from list
-        return tables
+        # each column comes from the first table (in table_list order) containing it
+        tables = set()
+        for c in cols:
+            candidates = self._column_to_tables[c]
+            tables.add(start_with if start_with in candidates else candidates[0])
+        return [t for t in table_list if t in tables]
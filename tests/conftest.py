@@ -0,0 +1,8 @@
+import pytest
+
+import genomic_features as gf
+
+
+@pytest.fixture(scope="session")
+def hsapiens108():
+    return gf.ensembl.annotation("Hsapiens", 108)
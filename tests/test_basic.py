@@ -1,7 +1,13 @@
+import sqlite3
+import time
+from types import SimpleNamespace
+
 import pandas as pd
 import pytest
 
 import genomic_features as gf
+from genomic_features._core import cache
+from genomic_features.ensembl import ensembldb
 
 
 def test_package_has_version():
@@ -13,6 +19,107 @@ def test_genes():
     assert isinstance(genes, pd.DataFrame)
 
 
+def test_genes_lazy():
+    ensdb = gf.ensembl.annotation("Hsapiens", 108)
+    query = ensdb.genes(cols=["gene_id", "gene_name"], execute=False)
+    assert not isinstance(query, pd.DataFrame)
+    pd.testing.assert_frame_equal(
+        query.execute(), ensdb.genes(cols=["gene_id", "gene_name"])
+    )
+    assert query.limit(2).execute().shape == (2, 2)
+
+
+def test_annotation_cached():
+    ensdb = gf.ensembl.annotation("Hsapiens", 108)
+    assert gf.ensembl.annotation("Hsapiens", "108") is ensdb
+
+
+def test_annotations(monkeypatch):
+    # Downloads are mocked, so no second EnsDb release is fetched
+    downloaded = []
+    monkeypatch.setattr(ensembldb, "retrieve_annotations", downloaded.extend)
+    monkeypatch.setattr(ensembldb, "annotation", lambda s, v, backend: (s, v))
+
+    species_versions = [("Hsapiens", 108), ("Mmusculus", 108)]
+    assert gf.ensembl.annotations(species_versions) == species_versions
+    assert downloaded == [
+        ensembldb._ensdb_url("Hsapiens", 108),
+        ensembldb._ensdb_url("Mmusculus", 108),
+    ]
+
+
+def test_retrieve_annotations_order(monkeypatch):
+    # Earlier urls finish last, results must still follow the input order
+    def retrieve_annotation(url):
+        time.sleep(0.05 * (3 - int(url)))
+        return f"path/{url}"
+
+    monkeypatch.setattr(cache, "retrieve_annotation", retrieve_annotation)
+    urls = ["0", "1", "2"]
+    assert cache.retrieve_annotations(urls, max_workers=3) == [
+        "path/0",
+        "path/1",
+        "path/2",
+    ]
+
+
+def test_annotationhub_db_refresh(monkeypatch, tmp_path):
+    hub_path = tmp_path / "annotationhub.sqlite3"
+
+    def write_hub(timestamp):
+        con = sqlite3.connect(hub_path)
+        con.execute("CREATE TABLE timestamp (timestamp TIMESTAMP)")
+        con.execute("INSERT INTO timestamp VALUES (?)", (timestamp,))
+        con.commit()
+        con.close()
+
+    downloads = []
+
+    def retrieve_annotation(url):
+        if not hub_path.exists():
+            downloads.append(url)
+            write_hub(remote["timestamp"])
+        return str(hub_path)
+
+    remote = {"timestamp": "2024-01-01 00:00:00"}
+    checks = []
+
+    def get(url, timeout):
+        checks.append(url)
+        return SimpleNamespace(text=remote["timestamp"])
+
+    monkeypatch.setattr(ensembldb, "retrieve_annotation", retrieve_annotation)
+    monkeypatch.setattr(ensembldb, "_http_session", lambda: SimpleNamespace(get=get))
+    monkeypatch.setattr(ensembldb, "_annotation_hub_cache", {})
+
+    ahdb = ensembldb._annotationhub_db()
+    assert len(downloads) == 1
+
+    # Within the check interval the connection is reused without a remote check
+    assert ensembldb._annotationhub_db() is ahdb
+    assert len(checks) == 1
+
+    # Timestamp unchanged: the connection is kept, nothing is downloaded
+    ensembldb._annotation_hub_cache["checked"] -= (
+        ensembldb._ANNOTATION_HUB_CHECK_INTERVAL
+    )
+    assert ensembldb._annotationhub_db() is ahdb
+    assert len(checks) == 2
+    assert len(downloads) == 1
+
+    # Timestamp changed: the cached file is replaced and reopened
+    remote["timestamp"] = "2025-01-01 00:00:00"
+    ensembldb._annotation_hub_cache["checked"] -= (
+        ensembldb._ANNOTATION_HUB_CHECK_INTERVAL
+    )
+    refreshed = ensembldb._annotationhub_db()
+    assert refreshed is not ahdb
+    assert len(downloads) == 2
+    assert refreshed.table("timestamp")["timestamp"].execute().iat[0] == pd.Timestamp(
+        "2025-01-01"
+    )
+
+
 def test_missing_version():
     with pytest.raises(ValueError):
         gf.ensembl.annotation("Hsapiens", 86)
@@ -44,3 +151,21 @@ def test_exons():
 
     pd.testing.assert_index_equal(exons_id.columns, pd.Index(["exon_id"]))
     assert exons_id.shape[0] == exons.shape[0]
+
+
+def test_chromosomes():
+    ensdb = gf.ensembl.annotation("Hsapiens", 108)
+    # Rows are kept in the order of the chromosome table
+    pd.testing.assert_frame_equal(
+        ensdb.chromosomes(), ensdb.db.table("chromosome").execute()
+    )
+
+    result = ensdb.chromosomes(
+        cols=["seq_name", "seq_length"], filter=gf.filters.SeqNameFilter(["1", "MT"])
+    )
+    assert list(result.columns) == ["seq_name", "seq_length"]
+    assert set(result["seq_name"]) == {"1", "MT"}
+
+    # chromosome is only linked to transcripts through gene
+    result = ensdb.transcripts(cols=["tx_id", "seq_length"])
+    assert result.shape[0] == ensdb.db.table("tx").count().execute()
@@ -1,14 +1,10 @@
+import ibis
 import pandas as pd
 import pytest
 
 import genomic_features as gf
 
 
-@pytest.fixture(scope="module")
-def hsapiens108():
-    return gf.ensembl.annotation("Hsapiens", 108)
-
-
 def test_tables_by_degree(hsapiens108):
     result = hsapiens108._tables_by_degree()
     assert result == [
@@ -39,6 +35,8 @@ def test_clean_columns(hsapiens108):
     assert result == ["gene_id"]
     result = hsapiens108._clean_columns(["gene_id", "gene_name"])
     assert result == ["gene_id", "gene_name"]
+    result = hsapiens108._clean_columns(["gene_name", "gene_id", "gene_name"])
+    assert result == ["gene_name", "gene_id"]
     with pytest.raises(ValueError):
         hsapiens108._clean_columns(["gene_id", "invalid_column"])
     with pytest.raises(ValueError):
@@ -142,3 +140,14 @@ def test_list_columns_include_unqueryable_cols(hsapiens108):
     # From metadata
     assert "value" not in cols
     assert "name" not in cols
+
+
+def test_no_join_for_single_table(hsapiens108):
+    # gene_id is also a column of tx, so no join with gene is needed
+    query = hsapiens108._build_query(
+        "tx", ["tx_id", "gene_id"], gf.filters.EmptyFilter()
+    )
+    sql = ibis.to_sql(query)
+    assert "JOIN" not in sql
+    # tx_id is the primary key of tx, so rows are already unique
+    assert "DISTINCT" not in sql
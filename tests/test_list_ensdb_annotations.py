@@ -3,6 +3,8 @@ import pytest
 
 import genomic_features as gf
 
+pytestmark = pytest.mark.network
+
 SPECIES = [
     "Scerevisiae",
     "Mmusculus_nzohlltj",
@@ -16,10 +18,11 @@ SPECIES = [
 def test_ensdb_versions():
     species_versions = gf.ensembl.list_ensdb_annotations("Hsapiens")
     assert isinstance(species_versions, pd.DataFrame)
-    species_versions = gf.ensembl.list_ensdb_annotations("Mmusculus")
-    assert isinstance(species_versions, pd.DataFrame)
-    species_versions = gf.ensembl.list_ensdb_annotations("Rnorvegicus")
+
+    species = ["Hsapiens", "Mmusculus", "Rnorvegicus"]
+    species_versions = gf.ensembl.list_ensdb_annotations(species)
     assert isinstance(species_versions, pd.DataFrame)
+    assert set(species_versions["Species"]) == set(species)
 
 
 def test_missing_species():